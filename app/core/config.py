@@ -15,6 +15,30 @@ class Settings(BaseSettings):
     gemini_api_key: str = ""
     gemini_model: str = "gemini-2.5-flash"
     
+    # PDF processing settings
+    pdf_parallel_workers: int = 1  # Worker processes for page extraction (1 = serial, 0 = all CPU cores)
+    
+    # Batch extraction settings
+    max_batch_concurrency: int = 8  # Upper bound on documents processed concurrently per batch
+    
+    # LLM chunking settings (long contracts are split into chunks extracted concurrently)
+    llm_chunk_max_tokens: int = 6000
+    llm_chunk_overlap_tokens: int = 200
+    llm_chunk_concurrency: int = 4  # Upper bound on chunk requests in flight per provider
+    
+    # LLM response cache settings
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_days: int = 7
+    llm_cache_dir: str = "data/llm_cache"
+    
+    # Semantic cache settings (requires sentence-transformers and faiss-cpu)
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.95
+    semantic_cache_ttl_days: int = 7
+    semantic_cache_max_entries: int = 10000
+    semantic_cache_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    semantic_cache_dir: str = "data/semantic_cache"
+    
     # API settings
     api_title: str = "Contract Clause Extractor API"
     api_version: str = "1.0.0"
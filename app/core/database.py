@@ -13,6 +13,13 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def create_missing_indexes():
+    """Create model indexes that are missing from tables created by an earlier version"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
 def get_db():
     """Dependency for getting database session"""
     db = SessionLocal()
@@ -2,7 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, Base, create_missing_indexes
 from app.core.logging_config import setup_logging
 from app.routers import extraction
 
@@ -16,6 +16,7 @@ logger = get_logger(__name__)
 # Create database tables
 logger.info("Creating database tables if they don't exist")
 Base.metadata.create_all(bind=engine)
+create_missing_indexes()
 logger.info("Database tables ready")
 
 # Create FastAPI application
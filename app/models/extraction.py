@@ -1,7 +1,8 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
 
 from app.core.database import Base
+from app.models.types import CompressedJSON
 
 
 class Extraction(Base):
@@ -12,6 +13,11 @@ class Extraction(Base):
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(String, unique=True, index=True, nullable=False)
     filename = Column(String, nullable=False)
-    clauses = Column(JSON, nullable=False)
-    doc_metadata = Column(JSON, nullable=True)
+    clauses = Column(CompressedJSON, nullable=False)
+    doc_metadata = Column(CompressedJSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        # Serves newest-first listing and (created_at, id) keyset pagination
+        Index("ix_extractions_created_at_id", created_at.desc(), id.desc()),
+    )
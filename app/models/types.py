@@ -0,0 +1,29 @@
+from typing import Any, Optional
+
+import orjson
+import zstandard
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON value stored as a zstd-compressed blob"""
+    
+    impl = LargeBinary
+    cache_ok = True
+    
+    compression_level = 3
+    
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return zstandard.compress(orjson.dumps(value), self.compression_level)
+    
+    def process_result_value(self, value: Any, dialect) -> Any:
+        if value is None:
+            return None
+        # Rows written before compression was introduced hold plain JSON text
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            value = bytes(value)
+            if value.startswith(zstandard.FRAME_HEADER):
+                value = zstandard.decompress(value)
+        return orjson.loads(value)
@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.logging_config import get_logger
+from app.models.extraction import Extraction
 from app.schemas.extraction import (
     ExtractionResponse,
     ExtractionListResponse,
+    BatchExtractionResponse,
+    BatchExtractionError,
     ErrorResponse,
     Clause
 )
@@ -19,6 +23,34 @@ router = APIRouter(prefix="/api", tags=["extractions"])
 extraction_service = ExtractionService()
 
 
+def _validate_provider(provider: Optional[str]) -> Provider:
+    """Normalize the provider query parameter and reject unsupported values"""
+    raw_provider = provider
+    if provider is None:
+        provider = "openai"
+    else:
+        provider = provider.lower().strip()
+    logger.debug(f"Provider after normalization: '{provider}' (raw input: {raw_provider})")
+    
+    if provider not in ["openai", "gemini"]:
+        logger.warning(f"Invalid provider rejected: {provider}")
+        raise HTTPException(status_code=400, detail="Provider must be 'openai' or 'gemini'")
+    
+    # Type assertion: provider is now guaranteed to be a valid Provider value
+    return provider  # type: ignore
+
+
+def _to_response(extraction: Extraction) -> ExtractionResponse:
+    """Convert an Extraction record to its response model"""
+    return ExtractionResponse(
+        document_id=extraction.document_id,
+        filename=extraction.filename,
+        clauses=[Clause(**clause) for clause in extraction.clauses],
+        metadata=extraction.doc_metadata,
+        created_at=extraction.created_at
+    )
+
+
 @router.post(
     "/extract",
     response_model=ExtractionResponse,
@@ -46,55 +78,28 @@ async def extract_contract_clauses(
     - metadata: Document metadata including page count and extraction info
     - created_at: Timestamp of extraction
     """
-    # Normalize and validate provider
-    raw_provider = provider
-    if provider is None:
-        provider = "openai"
-    else:
-        provider = provider.lower().strip()
-    
-    logger.info(f"Received extraction request: filename={file.filename}, provider={provider} (raw input: {raw_provider})")
-    logger.debug(f"Provider after normalization: '{provider}'")
+    logger.info(f"Received extraction request: filename={file.filename}, provider={provider}")
     
     # Validate file type
     if not file.filename.lower().endswith('.pdf'):
         logger.warning(f"Invalid file type rejected: {file.filename}")
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
-    # Validate provider
-    if provider not in ["openai", "gemini"]:
-        logger.warning(f"Invalid provider rejected: {provider}")
-        raise HTTPException(status_code=400, detail="Provider must be 'openai' or 'gemini'")
-    
-    # Type assertion: provider is now guaranteed to be a valid Provider value
-    provider: Provider = provider  # type: ignore
+    # Normalize and validate provider
+    provider = _validate_provider(provider)
     
     try:
-        # Read file content
-        logger.debug(f"Reading file content: {file.filename}")
-        file_content = await file.read()
-        logger.debug(f"File read successfully: {len(file_content)} bytes")
-        
-        # Process the contract
-        extraction = extraction_service.process_contract(
-            file_content=file_content,
+        # Process the contract, streaming from the spooled upload file
+        extraction = await extraction_service.process_contract(
+            file=file.file,
             filename=file.filename,
             db=db,
             provider=provider
         )
         
-        # Convert clauses to Pydantic models
-        clauses = [Clause(**clause) for clause in extraction.clauses]
+        logger.info(f"Extraction completed successfully: document_id={extraction.document_id}, clauses={len(extraction.clauses)}")
         
-        logger.info(f"Extraction completed successfully: document_id={extraction.document_id}, clauses={len(clauses)}")
-        
-        return ExtractionResponse(
-            document_id=extraction.document_id,
-            filename=extraction.filename,
-            clauses=clauses,
-            metadata=extraction.doc_metadata,
-            created_at=extraction.created_at
-        )
+        return _to_response(extraction)
         
     except ValueError as e:
         logger.error(f"Validation error during extraction: {str(e)}")
@@ -107,6 +112,62 @@ async def extract_contract_clauses(
         raise HTTPException(status_code=500, detail=f"Error processing document: {str(e)}")
 
 
+@router.post(
+    "/extract/batch",
+    response_model=BatchExtractionResponse,
+    status_code=201,
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad request"},
+        500: {"model": ErrorResponse, "description": "Internal server error"}
+    }
+)
+async def extract_contract_clauses_batch(
+    files: List[UploadFile] = File(..., description="PDF contract documents"),
+    provider: Optional[str] = Query("openai", description="LLM provider to use: 'openai' or 'gemini'"),
+    max_concurrency: Optional[int] = Query(None, ge=1, description="Maximum number of documents processed concurrently"),
+    db: Session = Depends(get_db)
+):
+    """
+    Extract clauses from several legal contracts in one request.
+    
+    - **files**: PDF contract documents to process
+    - **provider**: LLM provider to use ("openai" or "gemini"), defaults to "openai"
+    - **max_concurrency**: Documents processed concurrently (capped by MAX_BATCH_CONCURRENCY)
+    
+    Documents are processed concurrently and saved together. Returns:
+    - extractions: Extraction results for documents that succeeded
+    - errors: Filename and error detail for documents that failed
+    """
+    logger.info(f"Received batch extraction request: {len(files)} files, provider={provider}")
+    
+    # Validate file types
+    invalid_files = [file.filename for file in files if not file.filename.lower().endswith('.pdf')]
+    if invalid_files:
+        logger.warning(f"Invalid file types rejected: {invalid_files}")
+        raise HTTPException(status_code=400, detail=f"Only PDF files are supported: {', '.join(invalid_files)}")
+    
+    # Normalize and validate provider
+    provider = _validate_provider(provider)
+    
+    concurrency = min(max_concurrency or settings.max_batch_concurrency, settings.max_batch_concurrency)
+    
+    try:
+        result = await extraction_service.process_contracts_batch(
+            files=files,
+            db=db,
+            provider=provider,
+            max_concurrency=concurrency
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error processing batch: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error processing batch: {str(e)}")
+    
+    return BatchExtractionResponse(
+        extractions=[_to_response(extraction) for extraction in result["extractions"]],
+        errors=[BatchExtractionError(**error) for error in result["errors"]]
+    )
+
+
 @router.get(
     "/extractions/{document_id}",
     response_model=ExtractionResponse,
@@ -133,18 +194,9 @@ def get_extraction(
         logger.warning(f"Extraction not found: {document_id}")
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Convert clauses to Pydantic models
-    clauses = [Clause(**clause) for clause in extraction.clauses]
-    
-    logger.debug(f"Returning extraction: {document_id} with {len(clauses)} clauses")
+    logger.debug(f"Returning extraction: {document_id} with {len(extraction.clauses)} clauses")
     
-    return ExtractionResponse(
-        document_id=extraction.document_id,
-        filename=extraction.filename,
-        clauses=clauses,
-        metadata=extraction.doc_metadata,
-        created_at=extraction.created_at
-    )
+    return _to_response(extraction)
 
 
 @router.get(
@@ -154,33 +206,37 @@ def get_extraction(
 def list_extractions(
     page: int = Query(1, ge=1, description="Page number (1-indexed)"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous response's next_cursor"),
+    include_total: bool = Query(False, description="Include the total number of extractions"),
     db: Session = Depends(get_db)
 ):
     """
     List all contract extractions with pagination.
     
-    - **page**: Page number (default: 1)
+    - **page**: Page number (default: 1), ignored when a cursor is given and returned as null
     - **page_size**: Number of items per page (default: 10, max: 100)
+    - **cursor**: Continue after the last item of a previous page (faster than page for deep pages)
+    - **include_total**: Count all extractions (default: false)
     
-    Returns paginated list of all extractions.
+    Returns paginated list of all extractions, newest first, with next_cursor
+    set when more results are available.
     """
-    logger.debug(f"Listing extractions: page={page}, page_size={page_size}")
+    logger.debug(f"Listing extractions: page={page}, page_size={page_size}, cursor={cursor}, include_total={include_total}")
     
-    result = extraction_service.list_extractions(db, page=page, page_size=page_size)
+    try:
+        result = extraction_service.list_extractions(
+            db,
+            page=page,
+            page_size=page_size,
+            include_total=include_total,
+            cursor=cursor
+        )
+    except ValueError as e:
+        logger.warning(f"Invalid list request: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Convert extractions to response models
-    extractions = []
-    for extraction in result["extractions"]:
-        clauses = [Clause(**clause) for clause in extraction.clauses]
-        extractions.append(
-            ExtractionResponse(
-                document_id=extraction.document_id,
-                filename=extraction.filename,
-                clauses=clauses,
-                metadata=extraction.doc_metadata,
-                created_at=extraction.created_at
-            )
-        )
+    extractions = [_to_response(extraction) for extraction in result["extractions"]]
     
     logger.debug(f"Returning {len(extractions)} extractions (total: {result['total']})")
     
@@ -188,5 +244,6 @@ def list_extractions(
         total=result["total"],
         page=result["page"],
         page_size=result["page_size"],
+        next_cursor=result["next_cursor"],
         extractions=extractions
     )
@@ -28,12 +28,25 @@ class ExtractionResponse(BaseModel):
 
 class ExtractionListResponse(BaseModel):
     """Schema for paginated extraction list response"""
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None  # None when the page was fetched by cursor
     page_size: int
+    next_cursor: Optional[str] = None
     extractions: List[ExtractionResponse]
 
 
+class BatchExtractionError(BaseModel):
+    """Schema for a document that failed during batch extraction"""
+    filename: str
+    detail: str
+
+
+class BatchExtractionResponse(BaseModel):
+    """Schema for batch extraction response"""
+    extractions: List[ExtractionResponse]
+    errors: List[BatchExtractionError]
+
+
 class ErrorResponse(BaseModel):
     """Schema for error responses"""
     detail: str
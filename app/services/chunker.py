@@ -0,0 +1,159 @@
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import tiktoken
+
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_DEFAULT_ENCODING = "o200k_base"
+
+# Seconds to wait before retrying a tiktoken encoding that failed to load
+_ENCODING_RETRY_SECONDS = 300
+
+# Chunk boundaries: blank lines, page markers and ARTICLE / Section headings
+_SECTION_BREAK_RE = re.compile(
+    r"\n[ \t]*\n"
+    r"|\n(?=--- Page \d+ ---)"
+    r"|\n(?=[ \t]*(?:ARTICLE|Article)\s+\w+)"
+    r"|\n(?=[ \t]*(?:SECTION|Section)\s+\d+)"
+)
+
+
+class _ApproximateEncoding:
+    """Fallback tokenizer that treats every few characters as one token"""
+    
+    chars_per_token = 4
+    
+    def encode(self, text: str, **kwargs) -> List[str]:
+        step = self.chars_per_token
+        return [text[i:i + step] for i in range(0, len(text), step)]
+    
+    def decode(self, tokens: Sequence[str]) -> str:
+        return "".join(tokens)
+
+
+_APPROXIMATE_ENCODING = _ApproximateEncoding()
+
+# Loaded tiktoken encodings by model; the approximation is never stored here
+_encodings: Dict[Optional[str], Any] = {}
+_encoding_lock = threading.Lock()
+_encoding_failed_at: Optional[float] = None
+
+
+def _load_encoding(model: Optional[str]):
+    if model:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            logger.debug(f"No tiktoken encoding for model {model}, using {_DEFAULT_ENCODING}")
+    return tiktoken.get_encoding(_DEFAULT_ENCODING)
+
+
+def _get_encoding(model: Optional[str] = None):
+    """
+    Get the tokenizer for a model, falling back to an approximation if unavailable
+    
+    tiktoken downloads encoding files on first use, without a timeout, unless
+    they are already in TIKTOKEN_CACHE_DIR. Only one thread loads at a time;
+    others get the approximation meanwhile, and a failed load is not retried
+    for a while so a missing network does not stall every request.
+    """
+    global _encoding_failed_at
+    encoding = _encodings.get(model)
+    if encoding is not None:
+        return encoding
+    if _encoding_failed_at is not None and time.monotonic() - _encoding_failed_at < _ENCODING_RETRY_SECONDS:
+        return _APPROXIMATE_ENCODING
+    if not _encoding_lock.acquire(blocking=False):
+        return _APPROXIMATE_ENCODING
+    try:
+        encoding = _encodings.get(model)
+        if encoding is None:
+            encoding = _load_encoding(model)
+            _encodings[model] = encoding
+        _encoding_failed_at = None
+        return encoding
+    except Exception as e:
+        logger.warning(f"Failed to load tiktoken encoding, using approximate token counts: {str(e)}")
+        _encoding_failed_at = time.monotonic()
+        return _APPROXIMATE_ENCODING
+    finally:
+        _encoding_lock.release()
+
+
+def _split_sections(text: str) -> List[str]:
+    """Split text at natural section breaks, keeping every character"""
+    sections = []
+    start = 0
+    for match in _SECTION_BREAK_RE.finditer(text):
+        end = match.end()
+        if end > start:
+            sections.append(text[start:end])
+            start = end
+    if start < len(text):
+        sections.append(text[start:])
+    return sections
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int = 6000,
+    overlap: int = 200,
+    model: Optional[str] = None
+) -> List[str]:
+    """
+    Split contract text into overlapping chunks of at most max_tokens tokens
+    
+    Chunks end at section breaks where possible; sections longer than a
+    whole chunk are split on token boundaries. Each chunk after the first
+    starts with the last overlap tokens of the previous one.
+    
+    Args:
+        text: Contract text
+        max_tokens: Maximum tokens per chunk
+        overlap: Tokens repeated at the start of each following chunk
+        model: Model name used to pick the tokenizer
+    
+    Returns:
+        List of text chunks, or [text] if it already fits
+    """
+    if overlap < 0 or max_tokens <= overlap:
+        raise ValueError("max_tokens must be greater than overlap, and overlap must not be negative")
+    
+    encoding = _get_encoding(model)
+    sections = [encoding.encode(section, disallowed_special=()) for section in _split_sections(text)]
+    if sum(len(tokens) for tokens in sections) <= max_tokens:
+        return [text]
+    
+    chunks = []
+    current: list = []
+    seeded = 0  # Tokens at the start of current carried over from the previous chunk
+    
+    def _close_chunk() -> None:
+        nonlocal current, seeded
+        chunks.append(current)
+        current = current[-overlap:] if overlap else []
+        seeded = len(current)
+    
+    for tokens in sections:
+        while tokens:
+            space = max_tokens - len(current)
+            if len(tokens) <= space:
+                current.extend(tokens)
+                tokens = []
+            elif len(current) > seeded and len(tokens) <= max_tokens - overlap:
+                # The section fits in a fresh chunk, so break before it
+                _close_chunk()
+            else:
+                current.extend(tokens[:space])
+                tokens = tokens[space:]
+                _close_chunk()
+    if len(current) > seeded:
+        chunks.append(current)
+    
+    logger.debug(f"Split text into {len(chunks)} chunks (max tokens: {max_tokens}, overlap: {overlap})")
+    return [encoding.decode(chunk) for chunk in chunks]
@@ -1,11 +1,14 @@
-import uuid
+import asyncio
 from datetime import datetime
-from typing import Dict, Any
+from typing import List, Dict, Any, BinaryIO, Optional, Tuple
+import uuid6
+from fastapi import UploadFile
+from sqlalchemy import func, insert, select, tuple_
 from sqlalchemy.orm import Session
 
 from app.models.extraction import Extraction
 from app.services.pdf_processor import PDFProcessor
-from app.services.llm_service import LLMService, Provider
+from app.services.llm_service import Provider, get_llm_service
 from app.core.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -16,21 +19,20 @@ class ExtractionService:
     
     def __init__(self):
         self.pdf_processor = PDFProcessor()
-        # LLM service will be initialized per request with the provider
-        self._llm_service_cache = {}
     
-    def _get_llm_service(self, provider: Provider = "openai") -> LLMService:
-        """Get or create LLM service for the specified provider"""
-        if provider not in self._llm_service_cache:
-            logger.debug(f"Creating new LLM service instance for provider: {provider}")
-            self._llm_service_cache[provider] = LLMService(provider=provider)
-        else:
-            logger.debug(f"Reusing cached LLM service instance for provider: {provider}")
-        return self._llm_service_cache[provider]
+    @staticmethod
+    def _build_metadata(pdf_metadata: Dict[str, Any], clauses: List[Dict[str, Any]], provider: Provider) -> Dict[str, Any]:
+        """Combine PDF metadata with extraction details"""
+        return {
+            **pdf_metadata,
+            "extraction_timestamp": datetime.utcnow().isoformat(),
+            "clause_count": len(clauses),
+            "provider": provider,
+        }
     
-    def process_contract(
+    async def process_contract(
         self,
-        file_content: bytes,
+        file: BinaryIO,
         filename: str,
         db: Session,
         provider: Provider = "openai"
@@ -39,7 +41,7 @@ class ExtractionService:
         Process a contract document and extract clauses
         
         Args:
-            file_content: PDF file content as bytes
+            file: Seekable binary file object containing the PDF
             filename: Original filename
             db: Database session
             provider: LLM provider to use ("openai" or "gemini"), defaults to "openai"
@@ -48,12 +50,12 @@ class ExtractionService:
             Extraction record from database
         """
         logger.info(f"Processing contract: {filename} with provider: {provider}")
-        logger.debug(f"File size: {len(file_content)} bytes")
         
         # Extract text from PDF
         try:
             logger.debug("Extracting text from PDF")
-            pdf_data = self.pdf_processor.extract_text_from_pdf(file_content)
+            # PDF parsing is CPU-bound; keep it off the event loop
+            pdf_data = await asyncio.to_thread(self.pdf_processor.extract_text_from_pdf, file)
             text = pdf_data["text"]
             pdf_metadata = pdf_data["metadata"]
             logger.info(f"PDF processed: {pdf_metadata.get('page_count', 0)} pages, text length: {len(text)} chars")
@@ -64,24 +66,19 @@ class ExtractionService:
         # Extract clauses using LLM
         try:
             logger.debug(f"Extracting clauses using {provider}")
-            llm_service = self._get_llm_service(provider)
-            clauses = llm_service.extract_clauses(text)
+            llm_service = get_llm_service(provider)
+            clauses = await llm_service.extract_clauses(text)
             logger.info(f"Extracted {len(clauses)} clauses from document")
         except Exception as e:
             logger.error(f"Failed to extract clauses: {str(e)}", exc_info=True)
             raise
         
-        # Generate unique document ID
-        document_id = str(uuid.uuid4())
+        # Generate unique, time-ordered document ID (UUIDv7 keeps index inserts sequential)
+        document_id = str(uuid6.uuid7())
         logger.debug(f"Generated document ID: {document_id}")
         
         # Prepare metadata
-        metadata = {
-            **pdf_metadata,
-            "extraction_timestamp": datetime.utcnow().isoformat(),
-            "clause_count": len(clauses),
-            "provider": provider,
-        }
+        metadata = self._build_metadata(pdf_metadata, clauses, provider)
         
         # Create database record
         try:
@@ -105,6 +102,102 @@ class ExtractionService:
         
         return extraction
     
+    def process_contracts_bulk(self, items: List[Dict[str, Any]], db: Session) -> List[Extraction]:
+        """
+        Save several processed contracts with a single INSERT statement
+        
+        Args:
+            items: Processed contracts, each a dict with "filename", "clauses",
+                   "pdf_metadata" and "provider" keys
+            db: Database session
+            
+        Returns:
+            Extraction records in the same order as items
+        """
+        if not items:
+            return []
+        
+        logger.info(f"Saving {len(items)} extractions to database")
+        rows = []
+        for item in items:
+            rows.append({
+                "document_id": str(uuid6.uuid7()),
+                "filename": item["filename"],
+                "clauses": item["clauses"],
+                "doc_metadata": self._build_metadata(item["pdf_metadata"], item["clauses"], item["provider"]),
+                "created_at": datetime.utcnow(),
+            })
+        
+        try:
+            # Batched multi-row INSERT; the returned keys replace a refresh per row.
+            # Keys are matched by document_id so RETURNING order does not matter.
+            result = db.execute(
+                insert(Extraction).returning(Extraction.document_id, Extraction.id),
+                rows
+            )
+            ids = dict(result.tuples().all())
+            db.commit()
+            logger.info(f"Successfully saved {len(ids)} extractions to database")
+        except Exception as e:
+            logger.error(f"Failed to save extractions to database: {str(e)}", exc_info=True)
+            db.rollback()
+            raise
+        
+        return [Extraction(id=ids[row["document_id"]], **row) for row in rows]
+    
+    async def process_contracts_batch(
+        self,
+        files: List[UploadFile],
+        db: Session,
+        provider: Provider = "openai",
+        max_concurrency: int = 8
+    ) -> Dict[str, Any]:
+        """
+        Process several contract documents concurrently and save them in one insert
+        
+        Args:
+            files: Uploaded PDF files
+            db: Database session
+            provider: LLM provider to use ("openai" or "gemini"), defaults to "openai"
+            max_concurrency: Maximum number of documents processed at the same time
+            
+        Returns:
+            Dictionary with saved extractions and per-file errors
+        """
+        logger.info(f"Processing batch of {len(files)} contracts with provider: {provider} (max concurrency: {max_concurrency})")
+        semaphore = asyncio.Semaphore(max_concurrency)
+        llm_service = get_llm_service(provider)
+        
+        async def _process_one(file: UploadFile) -> Dict[str, Any]:
+            async with semaphore:
+                pdf_data = await asyncio.to_thread(self.pdf_processor.extract_text_from_pdf, file.file)
+                clauses = await llm_service.extract_clauses(pdf_data["text"])
+                logger.info(f"Extracted {len(clauses)} clauses from {file.filename}")
+                return {
+                    "filename": file.filename,
+                    "clauses": clauses,
+                    "pdf_metadata": pdf_data["metadata"],
+                    "provider": provider,
+                }
+        
+        results = await asyncio.gather(*[_process_one(file) for file in files], return_exceptions=True)
+        
+        items = []
+        errors = []
+        for file, result in zip(files, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to process {file.filename}: {str(result)}")
+                errors.append({"filename": file.filename, "detail": str(result)})
+            else:
+                items.append(result)
+        
+        extractions = self.process_contracts_bulk(items, db)
+        logger.info(f"Batch complete: {len(extractions)} succeeded, {len(errors)} failed")
+        return {
+            "extractions": extractions,
+            "errors": errors
+        }
+    
     def get_extraction(self, document_id: str, db: Session) -> Extraction:
         """
         Get extraction by document ID
@@ -124,34 +217,66 @@ class ExtractionService:
             logger.warning(f"Extraction not found: {document_id}")
         return extraction
     
+    @staticmethod
+    def _encode_cursor(extraction: Extraction) -> str:
+        """Build an opaque pagination cursor pointing after an extraction"""
+        return f"{extraction.created_at.isoformat()}_{extraction.id}"
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """Parse a pagination cursor into its (created_at, id) position"""
+        try:
+            created_at, extraction_id = cursor.rsplit("_", 1)
+            return datetime.fromisoformat(created_at), int(extraction_id)
+        except ValueError:
+            raise ValueError(f"Invalid cursor: {cursor}")
+    
     def list_extractions(
         self,
         db: Session,
         page: int = 1,
-        page_size: int = 10
+        page_size: int = 10,
+        include_total: bool = False,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         List all extractions with pagination
         
+        Pages are ordered newest first. With a cursor, rows are fetched with a
+        keyset condition instead of OFFSET, so deep pages cost the same as the first.
+        
         Args:
             db: Database session
-            page: Page number (1-indexed)
+            page: Page number (1-indexed), ignored when cursor is given
             page_size: Number of items per page
+            include_total: Whether to count all extractions
+            cursor: Cursor from a previous page's next_cursor
             
         Returns:
-            Dictionary with total count and list of extractions
+            Dictionary with total count (or None), page (None when cursor is given),
+            list of extractions and next cursor
         """
-        logger.debug(f"Listing extractions: page={page}, page_size={page_size}")
-        query = db.query(Extraction)
-        total = query.count()
+        logger.debug(f"Listing extractions: page={page}, page_size={page_size}, cursor={cursor}")
+        query = db.query(Extraction).order_by(Extraction.created_at.desc(), Extraction.id.desc())
+        if cursor:
+            query = query.filter(tuple_(Extraction.created_at, Extraction.id) < self._decode_cursor(cursor))
+        else:
+            query = query.offset((page - 1) * page_size)
+        
+        # Fetch one extra row to know whether another page follows
+        rows = query.limit(page_size + 1).all()
+        extractions = rows[:page_size]
+        next_cursor = self._encode_cursor(extractions[-1]) if len(rows) > page_size else None
         
-        offset = (page - 1) * page_size
-        extractions = query.order_by(Extraction.created_at.desc()).offset(offset).limit(page_size).all()
+        total = None
+        if include_total:
+            total = db.execute(select(func.count()).select_from(Extraction)).scalar()
         
         logger.debug(f"Found {len(extractions)} extractions (total: {total})")
         return {
             "total": total,
-            "page": page,
+            "page": None if cursor else page,
             "page_size": page_size,
+            "next_cursor": next_cursor,
             "extractions": extractions
         }
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+import orjson
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.schemas.extraction import ClauseExtractionResponse
+
+logger = get_logger(__name__)
+
+
+class LLMCache:
+    """Content-addressable file cache for LLM clause extraction results"""
+    
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize the cache
+        
+        Args:
+            cache_dir: Directory holding cache entries, defaults to LLM_CACHE_DIR from settings
+        """
+        self.cache_dir = Path(cache_dir or settings.llm_cache_dir)
+    
+    @staticmethod
+    def make_key(provider: str, model: str, prompt_version: str, text: str) -> str:
+        """
+        Build a cache key from everything that determines the LLM output
+        
+        Each part is length-prefixed so that different splits of the same
+        bytes can never produce the same key.
+        
+        Args:
+            provider: LLM provider name
+            model: Model name
+            prompt_version: Version of the extraction prompt
+            text: Contract text sent to the LLM
+        
+        Returns:
+            Hex-encoded SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        for part in (provider, model, prompt_version, text):
+            encoded = part.encode("utf-8")
+            digest.update(len(encoded).to_bytes(8, "big"))
+            digest.update(encoded)
+        return digest.hexdigest()
+    
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+    
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get cached clauses for a key
+        
+        Args:
+            key: Cache key from make_key
+        
+        Returns:
+            List of validated clauses, or None on a miss or an expired/invalid entry
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = orjson.loads(f.read())
+        except FileNotFoundError:
+            logger.debug(f"LLM cache miss: {key}")
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read LLM cache entry {key}: {str(e)}")
+            return None
+        
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at < time.time():
+            logger.debug(f"LLM cache entry expired: {key}")
+            path.unlink(missing_ok=True)
+            return None
+        
+        # Revalidate so a stale or hand-edited entry can never reach the caller
+        try:
+            result = ClauseExtractionResponse.model_validate({"clauses": entry.get("clauses")})
+        except ValidationError as e:
+            logger.warning(f"Invalid LLM cache entry {key}: {str(e)}")
+            return None
+        
+        logger.debug(f"LLM cache hit: {key}")
+        return [clause.model_dump() for clause in result.clauses]
+    
+    def set(self, key: str, value: List[Dict[str, Any]], ttl: Optional[int] = None) -> None:
+        """
+        Store clauses for a key
+        
+        Write failures are logged and ignored, since the cache is only an optimization.
+        
+        Args:
+            key: Cache key from make_key
+            value: Extracted clauses
+            ttl: Time to live in seconds, or None to never expire; zero or less stores nothing
+        """
+        if ttl is not None and ttl <= 0:
+            logger.debug(f"Skipping LLM cache entry with non-positive TTL: {key}")
+            return
+        
+        entry = {
+            "expires_at": time.time() + ttl if ttl is not None else None,
+            "clauses": value,
+        }
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(entry))
+            # Atomic rename so readers never see a partially written entry
+            os.replace(tmp_path, path)
+            logger.debug(f"Stored LLM cache entry: {key}")
+        except OSError as e:
+            logger.warning(f"Failed to write LLM cache entry {key}: {str(e)}")
+            tmp_path.unlink(missing_ok=True)
@@ -1,16 +1,68 @@
 from typing import List, Dict, Any, Literal
-import json
-from openai import OpenAI
+import asyncio
+import itertools
+import logging
+import re
+import orjson
+from functools import lru_cache
+from pydantic import ValidationError
+from openai import AsyncOpenAI, RateLimitError
 import google.generativeai as genai
+from google.api_core.exceptions import ResourceExhausted
 
 from app.core.config import settings
 from app.core.logging_config import get_logger
 from app.schemas.extraction import ClauseExtractionResponse
+from app.services.chunker import chunk_text
+from app.services.llm_cache import LLMCache
+from app.services.semantic_cache import SemanticCache
 
 logger = get_logger(__name__)
 
 Provider = Literal["openai", "gemini"]
 
+# Bump whenever the extraction prompts change so cached responses are not reused
+PROMPT_VERSION = "2"
+
+_WORD_RE = re.compile(r"\S+")
+
+# Rate-limited chunk requests are retried with exponential backoff
+_RATE_LIMIT_ERRORS = (RateLimitError, ResourceExhausted)
+_RATE_LIMIT_RETRIES = 3
+_RATE_LIMIT_BACKOFF_SECONDS = 1.0
+
+_SYSTEM_PROMPT = "You are a legal document analyzer. Extract and categorize clauses from contracts."
+
+_CLAUSE_INSTRUCTIONS = """Analyze the following legal contract and extract all key clauses.
+For each clause, provide:
+1. clause_type: The category of the clause (e.g., "Payment Terms", "Confidentiality", "Termination", "Liability", "Governing Law", etc.)
+2. content: The actual text of the clause
+3. page_number: The page number where the clause appears (if mentioned in the text)
+"""
+
+# Static prompt parts are built once; only the contract text is added per request
+_OPENAI_PROMPT_PREFIX = _CLAUSE_INSTRUCTIONS + """
+Contract text:
+"""
+
+_GEMINI_PROMPT_PREFIX = _SYSTEM_PROMPT + "\n\n" + _CLAUSE_INSTRUCTIONS + """
+Return the result as a JSON array of objects with these fields.
+
+Contract text:
+"""
+
+_GEMINI_PROMPT_SUFFIX = """
+
+Return only valid JSON in this exact format:
+[
+  {
+    "clause_type": "string",
+    "content": "string",
+    "page_number": number or null
+  }
+]
+"""
+
 
 class LLMService:
     """Service for extracting clauses using LLM"""
@@ -23,29 +75,37 @@ class LLMService:
             provider: LLM provider to use ("openai" or "gemini")
         """
         self.provider = provider
-        logger.info(f"Initializing LLM service with provider: {provider}")
+        logger.info("Initializing LLM service with provider: %s", provider)
         
         if provider == "openai":
-            self.client = OpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
+            self.client = AsyncOpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
             self.model = settings.openai_model
             if not settings.openai_api_key:
                 logger.warning("OpenAI API key not provided, will use mock extraction")
             else:
-                logger.debug(f"OpenAI client initialized with model: {self.model}")
+                logger.debug("OpenAI client initialized with model: %s", self.model)
         elif provider == "gemini":
             if settings.gemini_api_key:
                 genai.configure(api_key=settings.gemini_api_key)
                 self.client = genai.GenerativeModel(settings.gemini_model)
-                logger.debug(f"Gemini client initialized with model: {settings.gemini_model}")
+                logger.debug("Gemini client initialized with model: %s", settings.gemini_model)
             else:
                 self.client = None
                 logger.warning("Gemini API key not provided, will use mock extraction")
             self.model = settings.gemini_model
         else:
-            logger.error(f"Unsupported provider: {provider}")
+            logger.error("Unsupported provider: %s", provider)
             raise ValueError(f"Unsupported provider: {provider}")
+        
+        self.cache = LLMCache() if settings.llm_cache_enabled and settings.llm_cache_ttl_days > 0 else None
+        self.semantic_cache = None
+        if settings.semantic_cache_enabled and settings.semantic_cache_ttl_days > 0:
+            self.semantic_cache = SemanticCache(namespace=f"{provider}:{self.model}:{PROMPT_VERSION}")
+        
+        # Shared by every document using this service, so concurrent requests cannot flood the provider
+        self._chunk_semaphore = asyncio.Semaphore(settings.llm_chunk_concurrency)
     
-    def extract_clauses(self, text: str) -> List[Dict[str, Any]]:
+    async def extract_clauses(self, text: str) -> List[Dict[str, Any]]:
         """
         Extract clauses from contract text using LLM
         
@@ -55,42 +115,120 @@ class LLMService:
         Returns:
             List of extracted clauses with their types and content
         """
-        text_length = len(text)
-        logger.info(f"Starting clause extraction with {self.provider} (text length: {text_length} chars)")
+        logger.info("Starting clause extraction with %s (text length: %d chars)", self.provider, len(text))
         
         if not self.client:
             logger.warning("No API client available, using mock extraction")
             return self._mock_extraction(text)
         
-        prompt = self._create_extraction_prompt(text)
-        logger.debug(f"Created extraction prompt (length: {len(prompt)} chars)")
+        cache_key = None
+        if self.cache:
+            cache_key = LLMCache.make_key(self.provider, self.model, PROMPT_VERSION, text)
+            cached_clauses = self.cache.get(cache_key)
+            if cached_clauses is not None:
+                logger.info("Using cached extraction for %s (%d clauses)", self.provider, len(cached_clauses))
+                return cached_clauses
+        
+        embedding = None
+        if self.semantic_cache:
+            # Like the exact cache, this is only an optimization, so failures count as a miss
+            try:
+                embedding = await asyncio.to_thread(self.semantic_cache.embed, text)
+                similar_clauses = await asyncio.to_thread(self.semantic_cache.search, embedding)
+            except Exception as e:
+                logger.warning("Semantic cache lookup failed, treating as a miss: %s", e)
+                embedding = similar_clauses = None
+            if similar_clauses is not None:
+                logger.info("Using semantically cached extraction for %s (%d clauses)", self.provider, len(similar_clauses))
+                return similar_clauses
+        
+        # Long contracts are split so each request stays small; chunks run concurrently.
+        # Tokenizing is CPU-bound, so it runs off the event loop.
+        chunks = await asyncio.to_thread(
+            chunk_text,
+            text,
+            max_tokens=settings.llm_chunk_max_tokens,
+            overlap=settings.llm_chunk_overlap_tokens,
+            model=self.model
+        )
+        logger.debug("Extracting clauses from %d chunk(s)", len(chunks))
         
         try:
-            if self.provider == "openai":
-                clauses = self._extract_with_openai(prompt)
-            elif self.provider == "gemini":
-                clauses = self._extract_with_gemini(prompt)
-            else:
-                logger.error(f"Unsupported provider: {self.provider}")
-                raise ValueError(f"Unsupported provider: {self.provider}")
+            # Let every chunk finish before failing, so no request is left running unobserved
+            chunk_results = await asyncio.gather(
+                *[self._extract_chunk(chunk) for chunk in chunks],
+                return_exceptions=True
+            )
+            for result in chunk_results:
+                if isinstance(result, BaseException):
+                    raise result
+            clauses = self._merge_clauses(chunk_results)
             
-            logger.info(f"Successfully extracted {len(clauses)} clauses using {self.provider}")
-            logger.debug(f"Extracted clause types: {[c.get('clause_type') for c in clauses]}")
+            logger.info("Successfully extracted %d clauses using %s", len(clauses), self.provider)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Extracted clause types: %s", [c.get('clause_type') for c in clauses])
+            
+            # Only reached when every chunk parsed, so failed responses are never cached
+            if self.cache:
+                self.cache.set(cache_key, clauses, ttl=settings.llm_cache_ttl_days * 86400)
+            if embedding is not None:
+                try:
+                    await asyncio.to_thread(self.semantic_cache.add, embedding, clauses)
+                except Exception as e:
+                    logger.warning("Failed to store semantic cache entry: %s", e)
             return clauses
         except Exception as e:
-            logger.error(f"Error calling {self.provider} API: {str(e)}", exc_info=True)
+            logger.error("Error calling %s API: %s", self.provider, e, exc_info=True)
             raise ValueError(f"Error calling LLM API: {str(e)}")
     
-    def _extract_with_openai(self, prompt: str) -> List[Dict[str, Any]]:
+    async def _extract_chunk(self, text: str) -> List[Dict[str, Any]]:
+        """Extract clauses from a chunk within the concurrency limit, retrying when rate limited"""
+        for attempt in range(_RATE_LIMIT_RETRIES + 1):
+            async with self._chunk_semaphore:
+                try:
+                    return await self._extract_one(text)
+                except _RATE_LIMIT_ERRORS:
+                    if attempt == _RATE_LIMIT_RETRIES:
+                        raise
+            # Back off without holding a slot, so other chunks can proceed
+            delay = _RATE_LIMIT_BACKOFF_SECONDS * 2 ** attempt
+            logger.warning("Rate limited by %s, retrying chunk in %.1fs", self.provider, delay)
+            await asyncio.sleep(delay)
+    
+    async def _extract_one(self, text: str) -> List[Dict[str, Any]]:
+        """Extract clauses from a single chunk of contract text"""
+        if self.provider == "openai":
+            return await self._extract_with_openai(text)
+        elif self.provider == "gemini":
+            return await self._extract_with_gemini(text)
+        else:
+            logger.error("Unsupported provider: %s", self.provider)
+            raise ValueError(f"Unsupported provider: {self.provider}")
+    
+    @staticmethod
+    def _merge_clauses(chunk_results: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Merge per-chunk clauses, dropping duplicates from overlapping chunks"""
+        merged = []
+        seen = set()
+        for clauses in chunk_results:
+            for clause in clauses:
+                key = (clause.get("clause_type"), (clause.get("content") or "")[:200])
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(clause)
+        return merged
+    
+    async def _extract_with_openai(self, text: str) -> List[Dict[str, Any]]:
         """Extract clauses using OpenAI with structured output"""
-        logger.debug(f"Calling OpenAI API with structured output, model: {self.model}")
+        prompt = self._create_extraction_prompt(text)
+        logger.debug("Calling OpenAI API with structured output, model: %s (prompt length: %d chars)", self.model, len(prompt))
         # Use OpenAI's structured output feature with Pydantic model
-        response = self.client.responses.parse(
+        response = await self.client.responses.parse(
             model=self.model,
             input=[
                 {
                     "role": "system",
-                    "content": "You are a legal document analyzer. Extract and categorize clauses from contracts."
+                    "content": _SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -103,25 +241,22 @@ class LLMService:
         
         # Get parsed output from structured response
         extraction_result = response.output_parsed
-        logger.debug(f"OpenAI structured response received: {len(extraction_result.clauses)} clauses")
+        logger.debug("OpenAI structured response received: %d clauses", len(extraction_result.clauses))
         
         # Convert Pydantic models to dictionaries
         clauses = [clause.model_dump() for clause in extraction_result.clauses]
-        logger.debug(f"Converted {len(clauses)} clauses to dictionary format")
+        logger.debug("Converted %d clauses to dictionary format", len(clauses))
         
         return clauses
     
-    def _extract_with_gemini(self, prompt: str) -> List[Dict[str, Any]]:
+    async def _extract_with_gemini(self, text: str) -> List[Dict[str, Any]]:
         """Extract clauses using Gemini"""
-        logger.debug(f"Calling Gemini API with model: {self.model}")
         try:
             # Use JSON format prompt for Gemini
-            json_prompt = self._create_extraction_prompt_json(prompt.split("Contract text:")[1] if "Contract text:" in prompt else prompt)
-            full_prompt = f"""You are a legal document analyzer. Extract and categorize clauses from contracts.
-
-{json_prompt}"""
+            full_prompt = self._create_extraction_prompt_json(text)
+            logger.debug("Calling Gemini API with model: %s (prompt length: %d chars)", self.model, len(full_prompt))
             
-            response = self.client.generate_content(
+            response = await self.client.generate_content_async(
                 full_prompt,
                 generation_config={
                     "temperature": 0.3,
@@ -129,82 +264,63 @@ class LLMService:
             )
             
             result = response.text
-            logger.debug(f"Gemini response received (length: {len(result)} chars)")
+            logger.debug("Gemini response received (length: %d chars)", len(result))
             
             # Log token usage if available
             if hasattr(response, 'usage_metadata'):
                 usage = response.usage_metadata
-                logger.debug(f"Gemini token usage - prompt: {usage.prompt_token_count}, completion: {usage.candidates_token_count}, total: {usage.total_token_count}")
+                logger.debug("Gemini token usage - prompt: %s, completion: %s, total: %s", usage.prompt_token_count, usage.candidates_token_count, usage.total_token_count)
             
             clauses = self._parse_llm_response(result)
             return clauses
         except Exception as e:
-            logger.error(f"Gemini API call failed: {str(e)}", exc_info=True)
+            logger.error("Gemini API call failed: %s", e, exc_info=True)
             raise
     
     def _create_extraction_prompt(self, text: str) -> str:
         """Create prompt for LLM clause extraction"""
-        return f"""Analyze the following legal contract and extract all key clauses.
-For each clause, provide:
-1. clause_type: The category of the clause (e.g., "Payment Terms", "Confidentiality", "Termination", "Liability", "Governing Law", etc.)
-2. content: The actual text of the clause
-3. page_number: The page number where the clause appears (if mentioned in the text)
-
-Contract text:
-{text}
-"""
+        return _OPENAI_PROMPT_PREFIX + text + "\n"
     
     def _create_extraction_prompt_json(self, text: str) -> str:
-        """Create prompt for LLM clause extraction with JSON format instructions (for Gemini)"""
-        return f"""Analyze the following legal contract and extract all key clauses.
-For each clause, provide:
-1. clause_type: The category of the clause (e.g., "Payment Terms", "Confidentiality", "Termination", "Liability", "Governing Law", etc.)
-2. content: The actual text of the clause
-3. page_number: The page number where the clause appears (if mentioned in the text)
-
-Return the result as a JSON array of objects with these fields.
-
-Contract text:
-{text}
-
-Return only valid JSON in this exact format:
-[
-  {{
-    "clause_type": "string",
-    "content": "string",
-    "page_number": number or null
-  }}
-]
-"""
+        """Create prompt for LLM clause extraction with system and JSON format instructions (for Gemini)"""
+        return _GEMINI_PROMPT_PREFIX + text + _GEMINI_PROMPT_SUFFIX
     
     def _parse_llm_response(self, response: str) -> List[Dict[str, Any]]:
-        """Parse LLM response into structured clauses"""
+        """
+        Parse LLM response into structured clauses
+        
+        Raises:
+            ValueError: If the response has no valid JSON array of clauses, so a
+                malformed response is never mistaken for a contract without clauses
+        """
+        # Try to extract JSON from response
+        start_idx = response.find('[')
+        end_idx = response.rfind(']') + 1
+        
+        if start_idx == -1 or end_idx <= start_idx:
+            logger.warning("No valid JSON array found in LLM response")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response preview: %s...", response[:200])
+            raise ValueError("No valid JSON array found in LLM response")
+        
         try:
-            # Try to extract JSON from response
-            start_idx = response.find('[')
-            end_idx = response.rfind(']') + 1
-            
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = response[start_idx:end_idx]
-                clauses = json.loads(json_str)
-                logger.debug(f"Successfully parsed {len(clauses)} clauses from LLM response")
-                return clauses
-            else:
-                # If no valid JSON found, return empty list
-                logger.warning("No valid JSON array found in LLM response")
-                logger.debug(f"Response preview: {response[:200]}...")
-                return []
-        except json.JSONDecodeError as e:
-            # If JSON parsing fails, return empty list
-            logger.warning(f"JSON parsing failed: {str(e)}")
-            logger.debug(f"Response that failed to parse: {response[:500]}...")
-            return []
+            result = ClauseExtractionResponse.model_validate({"clauses": orjson.loads(response[start_idx:end_idx])})
+        except (orjson.JSONDecodeError, ValidationError) as e:
+            logger.warning("JSON parsing failed: %s", e)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response that failed to parse: %s...", response[:500])
+            raise ValueError(f"Invalid JSON in LLM response: {str(e)}")
+        
+        clauses = [clause.model_dump() for clause in result.clauses]
+        logger.debug("Successfully parsed %d clauses from LLM response", len(clauses))
+        return clauses
     
     def _mock_extraction(self, text: str) -> List[Dict[str, Any]]:
         """Mock extraction for testing without API key"""
         logger.warning("Using mock extraction (no API key available)")
         # Simple mock that creates a few sample clauses
-        words = text.split()[:100]  # Take first 100 words
+        # Take first 100 words without tokenizing the whole document
+        words = [match.group(0) for match in itertools.islice(_WORD_RE.finditer(text), 100)]
         mock_clauses = [
             {
                 "clause_type": "General Terms",
@@ -217,5 +333,23 @@ Return only valid JSON in this exact format:
                 "page_number": 1
             }
         ]
-        logger.debug(f"Mock extraction generated {len(mock_clauses)} clauses")
+        logger.debug("Mock extraction generated %d clauses", len(mock_clauses))
         return mock_clauses
+
+
+@lru_cache(maxsize=None)
+def get_llm_service(provider: Provider = "openai") -> LLMService:
+    """
+    Get the shared LLM service for a provider
+    
+    Services are created once per process so API clients and their
+    connection pools are reused across requests.
+    
+    Args:
+        provider: LLM provider to use ("openai" or "gemini")
+        
+    Returns:
+        LLMService instance for the provider
+    """
+    logger.debug("Creating LLM service instance for provider: %s", provider)
+    return LLMService(provider=provider)
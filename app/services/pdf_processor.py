@@ -1,39 +1,117 @@
-from typing import Dict, Any
-import PyPDF2
-from io import BytesIO
+from typing import Dict, Any, BinaryIO, List
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import pypdfium2 as pdfium
 
+from app.core.config import settings
 from app.core.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# PDFium is not thread-safe, so in-process access is serialized
+_pdfium_lock = threading.Lock()
+
+# Per-process PDF document, set up once by each pool worker
+_worker_pdf = None
+
+
+def _get_page_text(pdf: pdfium.PdfDocument, page_index: int) -> str:
+    """Extract text from a single page of an open document"""
+    page = pdf[page_index]
+    try:
+        text_page = page.get_textpage()
+        try:
+            return text_page.get_text_range().replace("\r\n", "\n")
+        finally:
+            text_page.close()
+    finally:
+        page.close()
+
+
+def _init_page_worker(file_content: bytes) -> None:
+    """Parse the PDF once per worker process"""
+    global _worker_pdf
+    _worker_pdf = pdfium.PdfDocument(file_content)
+
+
+def _extract_page(page_index: int) -> str:
+    """Extract text from a single page in a worker process"""
+    return _get_page_text(_worker_pdf, page_index)
+
 
 class PDFProcessor:
     """Service for processing PDF documents"""
     
     @staticmethod
-    def extract_text_from_pdf(file_content: bytes) -> Dict[str, Any]:
+    def _get_worker_count(page_count: int) -> int:
+        """Number of worker processes to use for a document with page_count pages"""
+        workers = settings.pdf_parallel_workers or os.cpu_count() or 1
+        return max(1, min(workers, page_count))
+    
+    @staticmethod
+    def _extract_page_texts_parallel(file_content: bytes, page_count: int, workers: int) -> List[str]:
+        """Extract text from every page in a process pool, in page order"""
+        logger.debug(f"Extracting {page_count} pages with {workers} worker processes")
+        # Spawn rather than fork, since the server process is multi-threaded
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_page_worker,
+            initargs=(file_content,)
+        ) as executor:
+            chunksize = max(1, page_count // (workers * 4))
+            return list(executor.map(_extract_page, range(page_count), chunksize=chunksize))
+    
+    @staticmethod
+    def extract_text_from_pdf(file: BinaryIO) -> Dict[str, Any]:
         """
         Extract text from PDF file
         
+        The file is read by PDFium on demand rather than loaded into memory,
+        except when pages are extracted in worker processes.
+        
         Args:
-            file_content: PDF file content as bytes
-            
+            file: Seekable binary file object containing the PDF
+        
         Returns:
             Dictionary containing extracted text and metadata
         """
         try:
-            logger.debug(f"Extracting text from PDF (size: {len(file_content)} bytes)")
-            pdf_file = BytesIO(file_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            file_size = file.seek(0, os.SEEK_END)
+            file.seek(0)
+            logger.debug(f"Extracting text from PDF (size: {file_size} bytes)")
+            with _pdfium_lock:
+                pdf = pdfium.PdfDocument(file)
+                try:
+                    page_count = len(pdf)
+                    logger.debug(f"PDF has {page_count} pages")
+                    
+                    workers = PDFProcessor._get_worker_count(page_count)
+                    if workers == 1:
+                        page_texts = [_get_page_text(pdf, page_index) for page_index in range(page_count)]
+                    pdf_info = pdf.get_metadata_dict(skip_empty=True)
+                finally:
+                    pdf.close()
             
-            text = ""
-            page_count = len(pdf_reader.pages)
-            logger.debug(f"PDF has {page_count} pages")
+            if workers > 1:
+                # Worker processes need their own copy of the document
+                file.seek(0)
+                page_texts = PDFProcessor._extract_page_texts_parallel(file.read(), page_count, workers)
             
-            for page_num, page in enumerate(pdf_reader.pages, start=1):
-                page_text = page.extract_text()
-                text += f"\n--- Page {page_num} ---\n{page_text}"
-                logger.debug(f"Extracted text from page {page_num} ({len(page_text)} chars)")
+            # Build the text from a list of chunks and join once
+            chunks: List[str] = []
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+            for page_num, page_text in enumerate(page_texts, start=1):
+                chunks.append("\n--- Page ")
+                chunks.append(str(page_num))
+                chunks.append(" ---\n")
+                chunks.append(page_text)
+                if debug_enabled:
+                    logger.debug(f"Extracted text from page {page_num} ({len(page_text)} chars)")
+            text = "".join(chunks)
             
             has_text = bool(text.strip())
             logger.info(f"PDF text extraction complete: {page_count} pages, {len(text)} total chars, has_text: {has_text}")
@@ -44,12 +122,12 @@ class PDFProcessor:
             }
             
             # Add PDF metadata if available
-            if pdf_reader.metadata:
+            if pdf_info:
                 metadata["pdf_metadata"] = {
-                    "title": pdf_reader.metadata.get("/Title", ""),
-                    "author": pdf_reader.metadata.get("/Author", ""),
-                    "subject": pdf_reader.metadata.get("/Subject", ""),
-                    "creator": pdf_reader.metadata.get("/Creator", ""),
+                    "title": pdf_info.get("Title", ""),
+                    "author": pdf_info.get("Author", ""),
+                    "subject": pdf_info.get("Subject", ""),
+                    "creator": pdf_info.get("Creator", ""),
                 }
                 logger.debug(f"PDF metadata found: {metadata['pdf_metadata']}")
             
@@ -0,0 +1,258 @@
+import hashlib
+import importlib.util
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+import orjson
+import uuid6
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.schemas.extraction import ClauseExtractionResponse
+
+logger = get_logger(__name__)
+
+# Contract text is embedded in windows because the embedding model truncates long inputs
+_EMBED_WINDOW_CHARS = 2000
+
+# Nearest entries by mean embedding that are checked window by window on a search
+_SEARCH_CANDIDATES = 8
+
+_embedding_model = None
+_embedding_model_lock = threading.Lock()
+
+
+def _get_embedding_model():
+    """Load the sentence-transformers model once per process"""
+    global _embedding_model
+    with _embedding_model_lock:
+        if _embedding_model is None:
+            from sentence_transformers import SentenceTransformer
+            
+            logger.info(f"Loading semantic cache embedding model: {settings.semantic_cache_model}")
+            _embedding_model = SentenceTransformer(settings.semantic_cache_model)
+        return _embedding_model
+
+
+class SemanticCache:
+    """Embedding-similarity cache for LLM clause extraction results"""
+    
+    def __init__(
+        self,
+        namespace: str,
+        cache_dir: Optional[str] = None,
+        threshold: Optional[float] = None,
+        ttl_days: Optional[int] = None,
+        max_entries: Optional[int] = None
+    ):
+        """
+        Initialize the cache and load any persisted entries
+        
+        Requires the optional sentence-transformers and faiss-cpu packages.
+        
+        Args:
+            namespace: Scope for entries, e.g. provider, model and prompt version
+            cache_dir: Directory holding the entries, defaults to SEMANTIC_CACHE_DIR from settings
+            threshold: Minimum cosine similarity every window must reach for a hit,
+                defaults to SEMANTIC_CACHE_THRESHOLD
+            ttl_days: Days an entry is reused, defaults to SEMANTIC_CACHE_TTL_DAYS
+            max_entries: Entries kept before the oldest are evicted, defaults to SEMANTIC_CACHE_MAX_ENTRIES
+        """
+        try:
+            import faiss
+            import numpy as np
+            # The model is loaded on the first embed, so check the package is there up front
+            if _embedding_model is None and importlib.util.find_spec("sentence_transformers") is None:
+                raise ImportError("No module named 'sentence_transformers'")
+        except ImportError as e:
+            raise RuntimeError(
+                "Semantic cache requires the 'sentence-transformers' and 'faiss-cpu' packages"
+            ) from e
+        
+        self._faiss = faiss
+        self._np = np
+        self.threshold = threshold if threshold is not None else settings.semantic_cache_threshold
+        self.ttl = (ttl_days if ttl_days is not None else settings.semantic_cache_ttl_days) * 86400
+        self.max_entries = max_entries if max_entries is not None else settings.semantic_cache_max_entries
+        # Entries are only comparable under the same embedding model
+        scope = f"{settings.semantic_cache_model}:{namespace}"
+        name = hashlib.sha256(scope.encode("utf-8")).hexdigest()[:16]
+        self.entries_dir = Path(cache_dir or settings.semantic_cache_dir) / name
+        self._lock = threading.Lock()
+        # Mean window embeddings keyed by entry id, used to find candidates quickly
+        self._index = None
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._next_id = 0
+        self._load()
+    
+    def _load(self) -> None:
+        if not self.entries_dir.is_dir():
+            return
+        cutoff = time.time() - self.ttl
+        loaded = []
+        for entry_path in self.entries_dir.glob("*.json"):
+            try:
+                with open(entry_path, "rb") as f:
+                    entry = orjson.loads(f.read())
+                created_at = entry["created_at"]
+                if created_at < cutoff:
+                    self._remove_files(entry_path.stem)
+                    continue
+                windows = self._np.load(entry_path.with_suffix(".npy"))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Failed to load semantic cache entry {entry_path.stem}: {str(e)}")
+                continue
+            loaded.append((created_at, entry_path.stem, windows, entry.get("clauses")))
+        
+        # Oldest first, so eviction order survives a restart
+        loaded.sort(key=lambda item: item[0])
+        for created_at, name, windows, clauses in loaded:
+            self._insert(name, windows, clauses, created_at)
+        self._evict()
+        logger.debug(f"Loaded semantic cache with {len(self._entries)} entries")
+    
+    def _mean_vector(self, windows):
+        vector = self._np.ascontiguousarray(windows.mean(axis=0, keepdims=True), dtype="float32")
+        self._faiss.normalize_L2(vector)
+        return vector
+    
+    def _insert(self, name: str, windows, clauses: List[Dict[str, Any]], created_at: float) -> None:
+        if self._index is None:
+            self._index = self._faiss.IndexIDMap(self._faiss.IndexFlatIP(windows.shape[1]))
+        elif windows.ndim != 2 or windows.shape[1] != self._index.d:
+            logger.warning(f"Semantic cache entry {name} has a different embedding size, skipping")
+            return
+        entry_id = self._next_id
+        self._next_id += 1
+        self._index.add_with_ids(self._mean_vector(windows), self._np.array([entry_id], dtype="int64"))
+        self._entries[entry_id] = {
+            "name": name,
+            "windows": windows,
+            "clauses": clauses,
+            "created_at": created_at,
+        }
+    
+    def _evict(self) -> None:
+        """Drop expired entries and the oldest entries beyond max_entries"""
+        cutoff = time.time() - self.ttl
+        # Entries are held in insertion order, i.e. oldest first
+        expired = [entry_id for entry_id, entry in self._entries.items() if entry["created_at"] < cutoff]
+        excess = len(self._entries) - len(expired) - self.max_entries
+        if excess > 0:
+            expired_ids = set(expired)
+            expired += [entry_id for entry_id in self._entries if entry_id not in expired_ids][:excess]
+        if not expired:
+            return
+        self._index.remove_ids(self._np.array(expired, dtype="int64"))
+        for entry_id in expired:
+            self._remove_files(self._entries.pop(entry_id)["name"])
+        logger.debug(f"Evicted {len(expired)} semantic cache entries ({len(self._entries)} remaining)")
+    
+    def _remove_files(self, name: str) -> None:
+        for suffix in (".json", ".npy"):
+            try:
+                (self.entries_dir / f"{name}{suffix}").unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Failed to remove semantic cache file {name}{suffix}: {str(e)}")
+    
+    def embed(self, text: str):
+        """
+        Embed contract text as one L2-normalized vector per window
+        
+        Whitespace is normalized first so formatting-only differences do not
+        shift the embedding windows.
+        
+        Args:
+            text: Contract text
+        
+        Returns:
+            float32 array of shape (windows, dim)
+        """
+        normalized = " ".join(text.split())
+        windows = [
+            normalized[i:i + _EMBED_WINDOW_CHARS]
+            for i in range(0, len(normalized), _EMBED_WINDOW_CHARS)
+        ] or [""]
+        vectors = _get_embedding_model().encode(windows, normalize_embeddings=True)
+        return self._np.ascontiguousarray(vectors, dtype="float32")
+    
+    def search(self, windows) -> Optional[List[Dict[str, Any]]]:
+        """
+        Find cached clauses for a previously seen text matching window by window
+        
+        An entry only matches if it has the same number of windows and every
+        window reaches the threshold against the window at the same position,
+        so one differing clause in a long contract is never averaged away.
+        
+        Args:
+            windows: Embeddings from embed
+        
+        Returns:
+            List of validated clauses, or None if no entry meets the threshold
+        """
+        with self._lock:
+            if self._index is None or self._index.ntotal == 0:
+                return None
+            k = min(_SEARCH_CANDIDATES, self._index.ntotal)
+            _, ids = self._index.search(self._mean_vector(windows), k)
+            cutoff = time.time() - self.ttl
+            best_score, best_entry = None, None
+            for entry_id in ids[0]:
+                entry = self._entries.get(int(entry_id))
+                if entry is None or entry["created_at"] < cutoff or entry["windows"].shape != windows.shape:
+                    continue
+                score = float((entry["windows"] * windows).sum(axis=1).min())
+                if score >= self.threshold and (best_score is None or score > best_score):
+                    best_score, best_entry = score, entry
+            if best_entry is None:
+                logger.debug("Semantic cache miss")
+                return None
+            name, clauses = best_entry["name"], best_entry["clauses"]
+        
+        try:
+            result = ClauseExtractionResponse.model_validate({"clauses": clauses})
+        except ValidationError as e:
+            logger.warning(f"Invalid semantic cache entry {name}: {str(e)}")
+            return None
+        
+        logger.debug(f"Semantic cache hit (lowest window score: {best_score:.4f})")
+        return [clause.model_dump() for clause in result.clauses]
+    
+    def add(self, windows, clauses: List[Dict[str, Any]]) -> None:
+        """
+        Add embeddings and their clauses to the cache and persist the entry
+        
+        Each entry is written to its own files, so adding never rewrites the
+        rest of the cache. Write failures are logged and ignored, since the
+        cache is only an optimization.
+        
+        Args:
+            windows: Embeddings from embed
+            clauses: Extracted clauses
+        """
+        name = uuid6.uuid7().hex
+        created_at = time.time()
+        windows_path = self.entries_dir / f"{name}.npy"
+        entry_path = self.entries_dir / f"{name}.json"
+        tmp_windows_path = windows_path.with_name(f"{windows_path.name}.{os.getpid()}.tmp")
+        tmp_entry_path = entry_path.with_name(f"{entry_path.name}.{os.getpid()}.tmp")
+        try:
+            self.entries_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_windows_path, "wb") as f:
+                self._np.save(f, windows)
+            os.replace(tmp_windows_path, windows_path)
+            # The JSON file is written last and marks the entry as complete
+            with open(tmp_entry_path, "wb") as f:
+                f.write(orjson.dumps({"created_at": created_at, "clauses": clauses}))
+            os.replace(tmp_entry_path, entry_path)
+        except OSError as e:
+            logger.warning(f"Failed to persist semantic cache entry: {str(e)}")
+        
+        with self._lock:
+            self._insert(name, windows, clauses, created_at)
+            self._evict()
+            logger.debug(f"Stored semantic cache entry ({len(self._entries)} total)")
@@ -4,14 +4,26 @@ Example script demonstrating how to use the Contract Clause Extractor API
 import requests
 import json
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # API base URL
 BASE_URL = "http://localhost:8000"
 
+# Shared session so connections are kept alive and reused across requests
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
 
 def test_health():
     """Test the health endpoint"""
-    response = requests.get(f"{BASE_URL}/health")
+    response = _session.get(f"{BASE_URL}/health")
     print(f"Health Check: {response.json()}")
     return response.status_code == 200
 
@@ -28,7 +40,7 @@ def extract_contract(pdf_path):
     """
     with open(pdf_path, 'rb') as f:
         files = {'file': (Path(pdf_path).name, f, 'application/pdf')}
-        response = requests.post(f"{BASE_URL}/api/extract", files=files)
+        response = _session.post(f"{BASE_URL}/api/extract", files=files)
     
     if response.status_code == 201:
         result = response.json()
@@ -60,7 +72,7 @@ def get_extraction(document_id):
     Returns:
         dict: Extraction result
     """
-    response = requests.get(f"{BASE_URL}/api/extractions/{document_id}")
+    response = _session.get(f"{BASE_URL}/api/extractions/{document_id}")
     
     if response.status_code == 200:
         result = response.json()
@@ -82,9 +94,9 @@ def list_extractions(page=1, page_size=10):
     Returns:
         dict: List of extractions with pagination info
     """
-    response = requests.get(
+    response = _session.get(
         f"{BASE_URL}/api/extractions",
-        params={'page': page, 'page_size': page_size}
+        params={'page': page, 'page_size': page_size, 'include_total': True}
     )
     
     if response.status_code == 200:
@@ -0,0 +1,21 @@
+import pytest
+
+
+@pytest.fixture
+def clauses():
+    """Validated clauses as stored by the caches and the database"""
+    return [
+        {"clause_type": "Payment Terms", "content": "Payment is due within 30 days", "page_number": 1},
+        {"clause_type": "Governing Law", "content": "Governed by Delaware law", "page_number": None},
+    ]
+
+
+@pytest.fixture
+def make_contract():
+    """Builder for contract text with numbered sections"""
+    def _make_contract(section_count):
+        return "\n\n".join(
+            f"Section {i}. The parties agree that obligation number {i} " + "applies in full. " * 40
+            for i in range(1, section_count + 1)
+        )
+    return _make_contract
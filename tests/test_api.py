@@ -1,18 +1,38 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 import io
+import uuid
 
 from app.main import app
+from app.core.config import settings
 from app.core.database import Base, get_db
 
-# Create test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# Create in-memory test database, shared by all sessions through a single connection
+SQLALCHEMY_DATABASE_URL = "sqlite+pysqlite:///file::memory:?cache=shared&uri=true"
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False, "uri": True},
+    poolclass=StaticPool
+)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base.metadata.create_all(bind=engine)
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragma(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def test_engine():
+    """Create the test schema once per session"""
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
 
 
 def override_get_db():
@@ -28,6 +48,37 @@ app.dependency_overrides[get_db] = override_get_db
 client = TestClient(app)
 
 
+def make_pdf(pages):
+    """Build a minimal PDF document with one line of text per page"""
+    page_count = len(pages)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(page_count))
+    font_id = 3 + 2 * page_count
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>".encode(),
+    ]
+    for i, page_text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({page_text}) Tj ET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        pdf += b"%010d 00000 n \n" % offset
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return pdf
+
+
 def test_read_root():
     """Test root endpoint"""
     response = client.get("/")
@@ -53,6 +104,44 @@ def test_list_extractions_empty():
     assert isinstance(data["extractions"], list)
 
 
+def test_list_extractions_cursor_pagination():
+    """Test walking all extractions with cursors"""
+    for i in range(3):
+        files = {"file": (f"page-{i}.pdf", io.BytesIO(make_pdf([f"Clause {i}"])), "application/pdf")}
+        assert client.post("/api/extract", files=files).status_code == 201
+
+    response = client.get("/api/extractions", params={"page_size": 2, "include_total": True})
+    assert response.status_code == 200
+    data = response.json()
+    total = data["total"]
+    assert total >= 3
+
+    document_ids = [e["document_id"] for e in data["extractions"]]
+    while data["next_cursor"]:
+        response = client.get("/api/extractions", params={"page_size": 2, "cursor": data["next_cursor"]})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] is None
+        assert data["page"] is None
+        document_ids.extend(e["document_id"] for e in data["extractions"])
+
+    assert len(document_ids) == total
+    assert len(set(document_ids)) == total
+
+
+def test_list_extractions_invalid_cursor():
+    """Test listing extractions with a malformed cursor"""
+    response = client.get("/api/extractions", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_extraction_indexes():
+    """Test that lookup and listing columns are indexed"""
+    indexes = {index["name"]: index for index in inspect(engine).get_indexes("extractions")}
+    assert indexes["ix_extractions_document_id"]["unique"]
+    assert indexes["ix_extractions_created_at_id"]["column_names"] == ["created_at", "id"]
+
+
 def test_get_extraction_not_found():
     """Test getting non-existent extraction"""
     response = client.get("/api/extractions/non-existent-id")
@@ -65,3 +154,62 @@ def test_extract_invalid_file_type():
     response = client.post("/api/extract", files=files)
     assert response.status_code == 400
     assert "Only PDF files are supported" in response.json()["detail"]
+
+
+def test_extract_pdf_with_mock_llm():
+    """Test end-to-end extraction using the mock LLM fallback"""
+    pdf = make_pdf(["Payment is due within thirty days", "This agreement is governed by Delaware law"])
+    files = {"file": ("contract.pdf", io.BytesIO(pdf), "application/pdf")}
+    response = client.post("/api/extract", files=files)
+    assert response.status_code == 201
+    data = response.json()
+    assert data["filename"] == "contract.pdf"
+    assert uuid.UUID(data["document_id"]).version == 7
+    assert data["metadata"]["page_count"] == 2
+    assert "Payment" in data["clauses"][0]["content"]
+
+    response = client.get(f"/api/extractions/{data['document_id']}")
+    assert response.status_code == 200
+    assert response.json()["clauses"] == data["clauses"]
+
+
+def test_extract_pdf_parallel_pages(monkeypatch):
+    """Test that parallel page extraction preserves page order"""
+    monkeypatch.setattr(settings, "pdf_parallel_workers", 2)
+    pdf = make_pdf([f"Section {i} of the agreement" for i in range(1, 4)])
+    files = {"file": ("parallel.pdf", io.BytesIO(pdf), "application/pdf")}
+    response = client.post("/api/extract", files=files)
+    assert response.status_code == 201
+    data = response.json()
+    assert data["metadata"]["page_count"] == 3
+    content = data["clauses"][0]["content"]
+    assert content.index("Section 1") < content.index("Section 2") < content.index("Section 3")
+
+
+def test_extract_batch():
+    """Test batch extraction with one invalid PDF"""
+    files = [
+        ("files", ("first.pdf", io.BytesIO(make_pdf(["Confidential information stays private"])), "application/pdf")),
+        ("files", ("broken.pdf", io.BytesIO(b"not a pdf"), "application/pdf")),
+        ("files", ("second.pdf", io.BytesIO(make_pdf(["Either party may terminate"])), "application/pdf")),
+    ]
+    response = client.post("/api/extract/batch", files=files, params={"max_concurrency": 2})
+    assert response.status_code == 201
+    data = response.json()
+    assert [e["filename"] for e in data["extractions"]] == ["first.pdf", "second.pdf"]
+    assert [e["filename"] for e in data["errors"]] == ["broken.pdf"]
+
+    response = client.get(f"/api/extractions/{data['extractions'][1]['document_id']}")
+    assert response.status_code == 200
+    assert "terminate" in response.json()["clauses"][0]["content"]
+
+
+def test_extract_batch_invalid_file_type():
+    """Test batch extraction rejects non-PDF files"""
+    files = [
+        ("files", ("contract.pdf", io.BytesIO(make_pdf(["Payment terms"])), "application/pdf")),
+        ("files", ("notes.txt", io.BytesIO(b"test content"), "text/plain")),
+    ]
+    response = client.post("/api/extract/batch", files=files)
+    assert response.status_code == 400
+    assert "notes.txt" in response.json()["detail"]
@@ -0,0 +1,65 @@
+import pytest
+
+from app.services import chunker
+from app.services.chunker import _get_encoding, chunk_text
+
+
+def token_count(text):
+    return len(_get_encoding(None).encode(text, disallowed_special=()))
+
+
+def test_short_text_is_single_chunk(make_contract):
+    """Test that text under the limit is returned unchanged"""
+    text = make_contract(2)
+    assert chunk_text(text, max_tokens=10000, overlap=50) == [text]
+
+
+def test_chunks_respect_token_limit(make_contract):
+    """Test that every chunk fits the limit and sections are not lost"""
+    text = make_contract(20)
+    chunks = chunk_text(text, max_tokens=500, overlap=50)
+    assert len(chunks) > 1
+    assert all(token_count(chunk) <= 500 for chunk in chunks)
+    for i in range(1, 21):
+        assert any(f"Section {i}." in chunk for chunk in chunks)
+
+
+def test_chunks_break_at_sections(make_contract):
+    """Test that chunks start at section boundaries when sections fit"""
+    text = make_contract(20)
+    chunks = chunk_text(text, max_tokens=500, overlap=0)
+    assert "".join(chunks) == text
+    assert all(chunk.startswith("Section") for chunk in chunks)
+
+
+def test_oversized_section_is_split():
+    """Test that a section longer than a chunk is split on token boundaries"""
+    text = "word " * 3000
+    chunks = chunk_text(text, max_tokens=400, overlap=40)
+    assert len(chunks) > 1
+    assert all(token_count(chunk) <= 400 for chunk in chunks)
+
+
+def test_invalid_overlap():
+    """Test that overlap must be smaller than the chunk size"""
+    with pytest.raises(ValueError):
+        chunk_text("text", max_tokens=100, overlap=100)
+
+
+def test_failed_encoding_is_not_cached(monkeypatch):
+    """Test that the approximation is used after a failed load without being memoized"""
+    def fail(model):
+        raise OSError("network unavailable")
+
+    monkeypatch.setattr(chunker, "_encodings", {})
+    monkeypatch.setattr(chunker, "_encoding_failed_at", None)
+    monkeypatch.setattr(chunker, "_load_encoding", fail)
+    assert isinstance(_get_encoding("gpt-4.1"), chunker._ApproximateEncoding)
+    assert "gpt-4.1" not in chunker._encodings
+
+    # After the retry delay the real encoding is loaded and kept
+    sentinel = object()
+    monkeypatch.setattr(chunker, "_load_encoding", lambda model: sentinel)
+    monkeypatch.setattr(chunker, "_encoding_failed_at", chunker.time.monotonic() - chunker._ENCODING_RETRY_SECONDS)
+    assert _get_encoding("gpt-4.1") is sentinel
+    assert chunker._encodings["gpt-4.1"] is sentinel
@@ -0,0 +1,58 @@
+import time
+
+from app.services.llm_cache import LLMCache
+
+
+def test_make_key_depends_on_every_part():
+    """Test that changing any key component changes the key"""
+    base = LLMCache.make_key("openai", "gpt-4.1", "1", "contract text")
+    assert base == LLMCache.make_key("openai", "gpt-4.1", "1", "contract text")
+    assert base != LLMCache.make_key("gemini", "gpt-4.1", "1", "contract text")
+    assert base != LLMCache.make_key("openai", "gpt-4.1-mini", "1", "contract text")
+    assert base != LLMCache.make_key("openai", "gpt-4.1", "2", "contract text")
+    assert base != LLMCache.make_key("openai", "gpt-4.1", "1", "other text")
+
+
+def test_make_key_is_length_prefixed():
+    """Test that shifting bytes between parts does not collide"""
+    assert LLMCache.make_key("ab", "c", "1", "x") != LLMCache.make_key("a", "bc", "1", "x")
+
+
+def test_cache_round_trip(tmp_path, clauses):
+    """Test storing and retrieving clauses"""
+    cache = LLMCache(cache_dir=str(tmp_path))
+    key = LLMCache.make_key("openai", "gpt-4.1", "1", "contract text")
+    assert cache.get(key) is None
+
+    cache.set(key, clauses, ttl=60)
+    assert cache.get(key) == clauses
+
+
+def test_cache_expired_entry(tmp_path, monkeypatch, clauses):
+    """Test that expired entries are treated as misses"""
+    cache = LLMCache(cache_dir=str(tmp_path))
+    cache.set("expired", clauses, ttl=60)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get("expired") is None
+    assert not (tmp_path / "expired.json").exists()
+
+
+def test_cache_non_positive_ttl(tmp_path, clauses):
+    """Test that a TTL of zero or less stores nothing"""
+    cache = LLMCache(cache_dir=str(tmp_path))
+    cache.set("zero", clauses, ttl=0)
+    cache.set("negative", clauses, ttl=-1)
+    assert cache.get("zero") is None
+    assert cache.get("negative") is None
+    assert not any(tmp_path.iterdir())
+
+
+def test_cache_invalid_entry(tmp_path):
+    """Test that entries failing validation are treated as misses"""
+    cache = LLMCache(cache_dir=str(tmp_path))
+    cache.set("invalid", [{"content": "missing clause type"}])
+    assert cache.get("invalid") is None
+
+    (tmp_path / "corrupt.json").write_text("not json")
+    assert cache.get("corrupt") is None
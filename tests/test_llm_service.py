@@ -0,0 +1,164 @@
+import asyncio
+import re
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from google.api_core.exceptions import ResourceExhausted
+
+from app.core.config import settings
+from app.services import llm_service
+from app.services.llm_cache import LLMCache
+from app.services.llm_service import LLMService
+
+
+class StubGeminiClient:
+    """Gemini client stand-in returning a fixed response text"""
+
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        self.calls += 1
+        return SimpleNamespace(text=self.text)
+
+
+class SectionStubClient:
+    """Gemini client stand-in returning one clause per section heading in the prompt"""
+
+    def __init__(self, rate_limited_calls=0):
+        self.rate_limited_calls = rate_limited_calls
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if self.calls <= self.rate_limited_calls:
+                raise ResourceExhausted("quota exceeded")
+            clauses = [
+                {"clause_type": "Obligation", "content": f"Obligation number {number}", "page_number": None}
+                for number in re.findall(r"Section (\d+)\.", prompt)
+            ]
+            # Every chunk reports the same clause, as overlapping chunks would
+            clauses.append({"clause_type": "Governing Law", "content": "Delaware law applies", "page_number": None})
+            return SimpleNamespace(text=orjson.dumps(clauses).decode())
+        finally:
+            self.active -= 1
+
+
+def make_service(tmp_path, response_text):
+    service = LLMService(provider="gemini")
+    service.client = StubGeminiClient(response_text)
+    service.cache = LLMCache(cache_dir=str(tmp_path))
+    return service
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "llm_chunk_max_tokens", 500)
+    monkeypatch.setattr(settings, "llm_chunk_overlap_tokens", 100)
+    monkeypatch.setattr(settings, "llm_chunk_concurrency", 2)
+
+
+def test_parse_llm_response():
+    """Test that a JSON array is found and validated inside surrounding text"""
+    service = LLMService(provider="gemini")
+    response = 'Here you go: [{"clause_type": "Payment Terms", "content": "Net 30", "page_number": 2}]'
+    assert service._parse_llm_response(response) == [
+        {"clause_type": "Payment Terms", "content": "Net 30", "page_number": 2}
+    ]
+    assert service._parse_llm_response("[]") == []
+
+
+@pytest.mark.parametrize("response", [
+    "I could not find any clauses",
+    "[not json]",
+    '[{"content": "missing clause type"}]',
+])
+def test_parse_llm_response_rejects_invalid(response):
+    """Test that malformed responses raise instead of returning no clauses"""
+    service = LLMService(provider="gemini")
+    with pytest.raises(ValueError):
+        service._parse_llm_response(response)
+
+
+def test_failed_parse_is_not_cached(tmp_path):
+    """Test that a malformed response fails the extraction and is not cached"""
+    service = make_service(tmp_path, "Sorry, something went wrong")
+    with pytest.raises(ValueError):
+        asyncio.run(service.extract_clauses("Payment is due within 30 days."))
+    assert not tmp_path.exists() or not any(tmp_path.iterdir())
+
+    service.client.text = '[{"clause_type": "Payment Terms", "content": "Payment is due within 30 days."}]'
+    clauses = asyncio.run(service.extract_clauses("Payment is due within 30 days."))
+    assert clauses[0]["clause_type"] == "Payment Terms"
+    assert service.client.calls == 2
+
+
+def test_extract_clauses_merges_chunks(tmp_path, small_chunks, make_contract):
+    """Test that chunks are dispatched within the concurrency limit and merged without duplicates"""
+    service = LLMService(provider="gemini")
+    service.client = SectionStubClient()
+    service.cache = LLMCache(cache_dir=str(tmp_path))
+
+    clauses = asyncio.run(service.extract_clauses(make_contract(20)))
+    assert service.client.calls > 1
+    assert service.client.max_active <= 2
+    contents = [clause["content"] for clause in clauses]
+    assert contents.count("Delaware law applies") == 1
+    contents.remove("Delaware law applies")
+    assert contents == [f"Obligation number {i}" for i in range(1, 21)]
+
+
+def test_cache_hit_skips_provider(tmp_path, small_chunks, make_contract):
+    """Test that a repeated contract is served from the cache"""
+    service = LLMService(provider="gemini")
+    service.client = SectionStubClient()
+    service.cache = LLMCache(cache_dir=str(tmp_path))
+    text = make_contract(20)
+
+    clauses = asyncio.run(service.extract_clauses(text))
+    calls = service.client.calls
+    assert asyncio.run(service.extract_clauses(text)) == clauses
+    assert service.client.calls == calls
+
+
+def test_rate_limited_chunk_is_retried(tmp_path, small_chunks, make_contract, monkeypatch):
+    """Test that a rate-limited chunk is retried instead of failing the document"""
+    monkeypatch.setattr(llm_service, "_RATE_LIMIT_BACKOFF_SECONDS", 0)
+    service = LLMService(provider="gemini")
+    service.client = SectionStubClient(rate_limited_calls=1)
+    service.cache = None
+
+    clauses = asyncio.run(service.extract_clauses(make_contract(20)))
+    assert len(clauses) == 21
+
+
+class FailingSemanticCache:
+    """Semantic cache stand-in whose embedding model cannot be loaded"""
+
+    def embed(self, text):
+        raise ModuleNotFoundError("No module named 'sentence_transformers'")
+
+    def search(self, windows):
+        raise AssertionError("search should not be reached")
+
+    def add(self, windows, clauses):
+        raise AssertionError("add should not be reached")
+
+
+def test_semantic_cache_failure_is_a_miss(tmp_path, small_chunks, make_contract):
+    """Test that a broken semantic cache does not fail the extraction"""
+    service = LLMService(provider="gemini")
+    service.client = SectionStubClient()
+    service.cache = None
+    service.semantic_cache = FailingSemanticCache()
+
+    clauses = asyncio.run(service.extract_clauses(make_contract(3)))
+    assert len(clauses) == 4
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+import zstandard
+from sqlalchemy import JSON, Column, DateTime, Integer, MetaData, String, Table, create_engine, insert, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.extraction import Extraction
+from app.models.types import CompressedJSON
+
+
+METADATA = {"page_count": 2, "has_text": True}
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_compressed_json_round_trip(engine, clauses):
+    """Test that values are stored as zstd frames and read back unchanged"""
+    with Session(engine) as db:
+        db.add(Extraction(document_id="doc-1", filename="a.pdf", clauses=clauses, doc_metadata=METADATA))
+        db.commit()
+
+    with engine.connect() as conn:
+        stored_clauses, stored_metadata = conn.execute(text("SELECT clauses, doc_metadata FROM extractions")).one()
+    assert stored_clauses.startswith(zstandard.FRAME_HEADER)
+    assert stored_metadata.startswith(zstandard.FRAME_HEADER)
+
+    with Session(engine) as db:
+        extraction = db.query(Extraction).one()
+        assert extraction.clauses == clauses
+        assert extraction.doc_metadata == METADATA
+
+
+def test_compressed_json_reads_legacy_rows(engine, clauses):
+    """Test that rows written as plain JSON before compression still load"""
+    legacy_table = Table(
+        "extractions",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("document_id", String),
+        Column("filename", String),
+        Column("clauses", JSON),
+        Column("doc_metadata", JSON),
+        Column("created_at", DateTime),
+    )
+    with engine.begin() as conn:
+        conn.execute(insert(legacy_table).values(
+            document_id="legacy",
+            filename="old.pdf",
+            clauses=clauses,
+            doc_metadata=None,
+            created_at=datetime.utcnow()
+        ))
+
+    with Session(engine) as db:
+        extraction = db.query(Extraction).filter(Extraction.document_id == "legacy").one()
+        assert extraction.clauses == clauses
+        assert extraction.doc_metadata is None
+
+
+def test_compressed_json_none():
+    """Test that None is stored as NULL rather than compressed"""
+    column_type = CompressedJSON()
+    assert column_type.process_bind_param(None, None) is None
+    assert column_type.process_result_value(None, None) is None
@@ -0,0 +1,107 @@
+import hashlib
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("faiss")
+
+from app.services import semantic_cache
+from app.services.semantic_cache import SemanticCache
+
+
+class StubEmbeddingModel:
+    """Embeds each distinct window as its own random unit vector"""
+
+    def encode(self, windows, normalize_embeddings=True):
+        vectors = []
+        for window in windows:
+            seed = int.from_bytes(hashlib.sha256(window.encode("utf-8")).digest()[:8], "big")
+            vector = np.random.default_rng(seed).standard_normal(64)
+            vectors.append(vector / np.linalg.norm(vector))
+        return np.array(vectors, dtype="float32")
+
+
+@pytest.fixture(autouse=True)
+def stub_embedding_model(monkeypatch):
+    monkeypatch.setattr(semantic_cache, "_embedding_model", StubEmbeddingModel())
+
+
+def make_long_contract(section_count, changed_section=None):
+    """Build contract text spanning several embedding windows"""
+    return " ".join(
+        f"Section {i}. " + ("Liability is unlimited. " if i == changed_section else "Liability is capped. ") * 20
+        for i in range(1, section_count + 1)
+    )
+
+
+def make_cache(tmp_path, **kwargs):
+    return SemanticCache(namespace="openai:gpt-4.1:1", cache_dir=str(tmp_path), threshold=0.95, **kwargs)
+
+
+def test_search_and_add(tmp_path, clauses):
+    """Test that a formatting-only change hits and a different text misses"""
+    cache = make_cache(tmp_path)
+    text = make_long_contract(10)
+    assert cache.search(cache.embed(text)) is None
+
+    cache.add(cache.embed(text), clauses)
+    assert cache.search(cache.embed(text.replace(" ", "  \n"))) == clauses
+    assert cache.search(cache.embed("An unrelated agreement")) is None
+
+
+def test_one_changed_window_misses(tmp_path, clauses):
+    """Test that a long contract differing in one section is not a hit"""
+    cache = make_cache(tmp_path)
+    windows = cache.embed(make_long_contract(200))
+    changed_windows = cache.embed(make_long_contract(200, changed_section=200))
+    # The mean embeddings alone are close enough to pass the threshold
+    mean, changed_mean = windows.mean(axis=0), changed_windows.mean(axis=0)
+    assert mean @ changed_mean / (np.linalg.norm(mean) * np.linalg.norm(changed_mean)) > 0.95
+
+    cache.add(windows, clauses)
+    assert cache.search(changed_windows) is None
+
+
+def test_entries_persist(tmp_path, clauses):
+    """Test that entries are reloaded by a new cache instance"""
+    text = make_long_contract(3)
+    cache = make_cache(tmp_path)
+    cache.add(cache.embed(text), clauses)
+
+    reloaded = make_cache(tmp_path)
+    assert reloaded.search(reloaded.embed(text)) == clauses
+
+
+def test_entries_expire(tmp_path, monkeypatch, clauses):
+    """Test that entries older than the TTL are misses and are removed"""
+    text = make_long_contract(3)
+    cache = make_cache(tmp_path, ttl_days=1)
+    cache.add(cache.embed(text), clauses)
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 86401)
+    assert cache.search(cache.embed(text)) is None
+    assert make_cache(tmp_path, ttl_days=1).search(cache.embed(text)) is None
+    assert not any(path.is_file() for path in tmp_path.rglob("*"))
+
+
+def test_max_entries_evicts_oldest(tmp_path, clauses):
+    """Test that the oldest entry is evicted once the cap is reached"""
+    cache = make_cache(tmp_path, max_entries=2)
+    texts = [f"Contract number {i}" for i in range(3)]
+    for text in texts:
+        cache.add(cache.embed(text), clauses)
+
+    assert cache.search(cache.embed(texts[0])) is None
+    assert cache.search(cache.embed(texts[1])) == clauses
+    assert cache.search(cache.embed(texts[2])) == clauses
+    assert len(list(tmp_path.rglob("*.json"))) == 2
+
+
+def test_missing_sentence_transformers(tmp_path, monkeypatch):
+    """Test that a missing embedding package fails at construction, not on the first embed"""
+    monkeypatch.setattr(semantic_cache, "_embedding_model", None)
+    monkeypatch.setattr(semantic_cache.importlib.util, "find_spec", lambda name: None)
+    with pytest.raises(RuntimeError):
+        make_cache(tmp_path)